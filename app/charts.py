@@ -1,19 +1,52 @@
-from typing import List, Optional, Tuple
+import json
+from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
+import streamlit as st
+from plotly.subplots import make_subplots
+
+# plotly serializes figures with orjson when it is importable, which is
+# markedly faster for the ndarray-backed traces built below; the import is
+# optional so the dashboard still runs without it
+try:
+	import orjson
+	_loads = orjson.loads
+except ImportError:
+	_loads = json.loads
+
+# Above this many points SVG scatter rendering degrades in the browser;
+# switch to the WebGL scattergl trace type instead
+GL_THRESHOLD = 4000
+
+
+# C-level content hash for DataFrame arguments so st.cache_data does not
+# fall back to pickling whole frames when keying the chart caches
+_DF_HASH_FUNCS = {
+	pd.DataFrame: lambda d: (d.shape, pd.util.hash_pandas_object(d, index=True).values.tobytes()),
+}
+
+# With more series than this per figure, line_chart merges them into a
+# single separator-delimited trace rather than one trace per series
+MERGE_TRACE_THRESHOLD = 8
+
+
+def _scatter_type(point_count: int) -> str:
+	return "scattergl" if point_count > GL_THRESHOLD else "scatter"
 
 
 def _add_trendline(fig: go.Figure, x, y, name: str = "Trend") -> None:
 	if len(x) < 2:
 		return
-	# Simple linear regression via numpy polyfit to draw a dashed trend
-	import numpy as np
-	mask = pd.notna(y)
+	# Simple linear regression via numpy polyfit to draw a dashed trend;
+	# positions come from np.arange so no sort-based rank() is needed
+	y_arr = np.asarray(y, dtype=np.float64)
+	mask = ~np.isnan(y_arr)
 	if mask.sum() < 2:
 		return
-	coef = np.polyfit(pd.to_numeric(pd.Series(x)[mask].rank()), y[mask], 1)
-	x_idx = pd.Series(x).rank()
+	x_idx = np.arange(len(y_arr), dtype=np.float64)
+	coef = np.polyfit(x_idx[mask], y_arr[mask], 1)
 	trend = coef[0] * x_idx + coef[1]
 	fig.add_trace(
 		go.Scatter(
@@ -27,35 +60,83 @@ def _add_trendline(fig: go.Figure, x, y, name: str = "Trend") -> None:
 	)
 
 
-def line_chart(df: pd.DataFrame, x_col: str, y_cols: List[str], title: str, height: int = 250, show_mom_change: bool = False) -> go.Figure:
-	fig = go.Figure()
-	for col in y_cols:
-		if col not in df.columns:
-			continue
-		
+def _base_legend() -> dict:
+	# Shared horizontal bottom legend used by the line charts
+	return dict(
+		orientation="h",
+		yanchor="top",
+		y=-0.25,
+		xanchor="center",
+		x=0.5,
+	)
+
+
+def _mom_change_pct(y_arr: np.ndarray) -> np.ndarray:
+	"""Month-over-month percent change per point; NaN where undefined."""
+	values = np.asarray(y_arr, dtype=np.float64)
+	pct = np.full(len(values), np.nan)
+	if len(values) > 1:
+		previous = values[:-1]
+		with np.errstate(divide="ignore", invalid="ignore"):
+			change = (values[1:] - previous) / previous * 100.0
+		change[previous == 0] = np.nan
+		pct[1:] = change
+	return pct
+
+
+def line_chart(df: Optional[pd.DataFrame] = None, x_col: Optional[str] = None, y_cols: Optional[List[str]] = None, title: str = "", height: int = 250, show_mom_change: bool = False, x: Optional[np.ndarray] = None, ys: Optional[Dict[str, np.ndarray]] = None) -> dict:
+	"""Cached line chart as a plain figure dict st.plotly_chart accepts.
+
+	The cache stores serialized JSON rather than go.Figure objects: a
+	cache hit then copies one string instead of pickling a whole figure,
+	and no plotly validation runs on the hit path.
+	"""
+	return _loads(_line_chart_json(df, x_col, y_cols, title, height, show_mom_change, x, ys))
+
+
+@st.cache_data(show_spinner=False, hash_funcs=_DF_HASH_FUNCS)
+def _line_chart_json(df: Optional[pd.DataFrame] = None, x_col: Optional[str] = None, y_cols: Optional[List[str]] = None, title: str = "", height: int = 250, show_mom_change: bool = False, x: Optional[np.ndarray] = None, ys: Optional[Dict[str, np.ndarray]] = None) -> str:
+	# Callers can pass either (df, x_col, y_cols) or precomputed arrays via
+	# (x, ys); the latter skips per-column Series allocation entirely.
+	if ys is None:
+		ys = {col: df[col].to_numpy() for col in y_cols if col in df.columns}
+		x = df[x_col].to_numpy()
+		x_range = [df[x_col].min(), df[x_col].max()] if not df.empty else None
+	else:
+		x_range = [x.min(), x.max()] if len(x) else None
+
+	# Build raw trace dicts instead of go.Scatter objects: graph_objects
+	# constructors validate+copy every property, which dominates build time
+	# for small figures rebuilt on each rerun.
+	traces = []
+
+	# Plotly render cost grows super-linearly with trace count, so for wide
+	# figures all series collapse into one trace with None separators; the
+	# usual handful of series keeps one trace each for legend/hover quality
+	if len(ys) > MERGE_TRACE_THRESHOLD:
+		separator = np.array([None], dtype=object)
+		x_parts: List[np.ndarray] = []
+		y_parts: List[np.ndarray] = []
+		for y_arr in ys.values():
+			x_parts.extend((np.asarray(x, dtype=object), separator))
+			y_parts.extend((np.asarray(y_arr, dtype=object), separator))
+		traces.append({
+			"type": _scatter_type(len(x) * len(ys)),
+			"x": np.concatenate(x_parts),
+			"y": np.concatenate(y_parts),
+			"mode": "lines",
+			"name": f"{len(ys)} series",
+			"connectgaps": False,
+			"hovertemplate": "<b>%{x}</b><br>%{y:,.0f}<extra></extra>",
+		})
+		series_items = []
+	else:
+		series_items = list(ys.items())
+
+	for col, y_arr in series_items:
 		# Calculate month-over-month change percentage if requested
-		mom_change_pct = None
-		if show_mom_change:
-			# Calculate MoM change for each point
-			mom_change_pct = []
-			for i in range(len(df)):
-				if pd.isna(df[col].iloc[i]):
-					mom_change_pct.append(float('nan'))
-				elif i == 0:
-					mom_change_pct.append(float('nan'))  # No previous value for first point
-				else:
-					current = df[col].iloc[i]
-					previous = df[col].iloc[i-1]
-					if pd.notna(previous) and previous != 0:
-						change_pct = ((current - previous) / previous) * 100
-						mom_change_pct.append(change_pct)
-					else:
-						mom_change_pct.append(float('nan'))
-			
-			# Convert to numpy array for better handling
-			import numpy as np
-			mom_change_pct = np.array(mom_change_pct)
-		
+		mom_change_pct = _mom_change_pct(y_arr) if show_mom_change else None
+
 		# Build hover template
 		if show_mom_change and mom_change_pct is not None:
 			hovertemplate = "<b>%{x}</b><br>" + \
@@ -68,258 +149,204 @@ def line_chart(df: pd.DataFrame, x_col: str, y_cols: List[str], title: str, heig
 							f"<b>{col}:</b> %{{y:,.0f}}<br>" + \
 							"<extra></extra>"
 			customdata = None
-		
-		fig.add_trace(
-			go.Scatter(
-				x=df[x_col],
-				y=df[col],
-				mode="lines+markers",
-				name=col,
-				hovertemplate=hovertemplate,
-				customdata=customdata
-			)
-		)
-	# Trendline removed - no longer adding trendlines to charts
-	# first = y_cols[0] if y_cols else None
-	# if first and first in df.columns:
-	# 	_add_trendline(fig, df[x_col], df[first])
-	
+
+		trace = {
+			"type": _scatter_type(len(x)),
+			"x": x,
+			"y": y_arr,
+			"mode": "lines+markers",
+			"name": col,
+			"hovertemplate": hovertemplate,
+		}
+		if customdata is not None:
+			trace["customdata"] = customdata
+		traces.append(trace)
+
+	# Assemble the layout as one dict so the figure is validated once instead
+	# of re-validating on every update_layout/update_*axes call.
+	layout = {
+		"margin": dict(l=2, r=2, t=20, b=50),
+		"title": title,
+		"height": height,
+		"legend": _base_legend(),
+	}
+
 	# Set x-axis range to match filtered data
-	if not df.empty and x_col in df.columns:
-		x_min = df[x_col].min()
-		x_max = df[x_col].max()
-		fig.update_xaxes(range=[x_min, x_max])
-	
-	# Format y-axis to show B, M, K units with custom formatting
-	fig.update_yaxes(
-		tickformat=".0f",
-		tickprefix="",
-		ticksuffix="",
-		separatethousands=True
-	)
-	
-	# Custom Y-axis labels for better readability
-	if not df.empty and y_cols:
-		# Get the range of values to determine appropriate tick values
-		all_values = []
-		for col in y_cols:
-			if col in df.columns:
-				all_values.extend(df[col].dropna().tolist())
-		
-		if all_values:
-			max_val = max(all_values)
-			min_val = min(all_values)
-			range_val = max_val - min_val
-			
-			if max_val >= 1_000_000_000:  # 1B+
-				# Create more tick points for better readability
-				tick_count = 6
-				tick_vals = []
-				tick_texts = []
-				for i in range(tick_count):
-					val = min_val + (range_val * i / (tick_count - 1))
-					tick_vals.append(val)
-					tick_texts.append(f"{val/1_000_000_000:.1f}B")
-				
-				fig.update_yaxes(
-					tickvals=tick_vals,
-					ticktext=tick_texts,
-					nticks=tick_count
-				)
-			elif max_val >= 1_000_000:  # 1M+
-				tick_count = 6
-				tick_vals = []
-				tick_texts = []
-				for i in range(tick_count):
-					val = min_val + (range_val * i / (tick_count - 1))
-					tick_vals.append(val)
-					tick_texts.append(f"{val/1_000_000:.1f}M")
-				
-				fig.update_yaxes(
-					tickvals=tick_vals,
-					ticktext=tick_texts,
-					nticks=tick_count
-				)
-			elif max_val >= 1_000:  # 1K+
-				tick_count = 6
-				tick_vals = []
-				tick_texts = []
-				for i in range(tick_count):
-					val = min_val + (range_val * i / (tick_count - 1))
-					tick_vals.append(val)
-					tick_texts.append(f"{val/1_000:.1f}K")
-				
-				fig.update_yaxes(
-					tickvals=tick_vals,
-					ticktext=tick_texts,
-					nticks=tick_count
-				)
-	
-	# Position legend at bottom
-	fig.update_layout(
-		margin=dict(l=2, r=2, t=20, b=50), 
-		title=title, 
-		height=height,
-		legend=dict(
-			orientation="h",
-			yanchor="top",
-			y=-0.25,
-			xanchor="center",
-			x=0.5
-		)
-	)
-	return fig
-
-
-def area_chart(df: pd.DataFrame, x_col: str, y_col: str, title: str) -> go.Figure:
-	fig = go.Figure(
-		data=[
-			go.Scatter(
-				x=df[x_col],
-				y=df[y_col],
-				mode="lines",
-				fill="tozeroy",
-				name=y_col,
-				hovertemplate="<b>%{x}</b><br>" +
+	if x_range is not None:
+		layout["xaxis"] = {"range": x_range}
+
+	# Abbreviated tick labels (1.2G, 345M, 6.7k) come from plotly.js's own
+	# SI tickformat, so no tick values need to be computed in Python
+	layout["yaxis"] = {"tickformat": "~s", "separatethousands": True}
+	return go.Figure(dict(data=traces, layout=layout), skip_invalid=True).to_json()
+
+
+def area_chart(df: Optional[pd.DataFrame] = None, x_col: Optional[str] = None, y_col: str = "", title: str = "", x: Optional[np.ndarray] = None, y: Optional[np.ndarray] = None) -> dict:
+	"""Cached area chart as a figure dict; see line_chart for the JSON caching."""
+	return _loads(_area_chart_json(df, x_col, y_col, title, x, y))
+
+
+@st.cache_data(show_spinner=False, hash_funcs=_DF_HASH_FUNCS)
+def _area_chart_json(df: Optional[pd.DataFrame] = None, x_col: Optional[str] = None, y_col: str = "", title: str = "", x: Optional[np.ndarray] = None, y: Optional[np.ndarray] = None) -> str:
+	# As with line_chart, (x, y) arrays may replace (df, x_col); y_col then
+	# only labels the trace
+	if y is None:
+		x = df[x_col].to_numpy()
+		y = df[y_col].to_numpy()
+		x_range = [df[x_col].min(), df[x_col].max()] if not df.empty else None
+	else:
+		x_range = [x.min(), x.max()] if len(x) else None
+
+	traces = [
+		{
+			"type": _scatter_type(len(x)),
+			"x": x,
+			"y": y,
+			"mode": "lines",
+			"fill": "tozeroy",
+			"name": y_col,
+			"hovertemplate": "<b>%{x}</b><br>" +
 							f"<b>{y_col}:</b> %{{y:,.0f}}<br>" +
-							"<extra></extra>"
-			)
-		]
-	)
-	
+							"<extra></extra>",
+		}
+	]
+
+	layout = {
+		"margin": dict(l=2, r=2, t=20, b=10),
+		"title": title,
+		"height": 180,
+	}
+
 	# Set x-axis range to match filtered data
-	if not df.empty and x_col in df.columns:
-		x_min = df[x_col].min()
-		x_max = df[x_col].max()
-		fig.update_xaxes(range=[x_min, x_max])
-	
-	# Format y-axis to show B, M, K units with custom formatting
-	fig.update_yaxes(
-		tickformat=".0f",
-		tickprefix="",
-		ticksuffix="",
-		separatethousands=True
+	if x_range is not None:
+		layout["xaxis"] = {"range": x_range}
+
+	# SI-prefixed tick labels rendered by plotly.js, as in line_chart
+	layout["yaxis"] = {"tickformat": "~s", "separatethousands": True}
+	return go.Figure(dict(data=traces, layout=layout), skip_invalid=True).to_json()
+
+
+def multi_line_facet(x: np.ndarray, panels: List[Dict[str, np.ndarray]], titles: Optional[List[str]] = None, height: int = 200, cols: int = 3, show_mom_change: bool = False) -> dict:
+	"""A grid of small line charts as a single faceted figure.
+
+	Each entry in panels is a {label: y array} dict for one facet; facets
+	wrap into rows of `cols` and `height` is per row. Compared with one
+	st.plotly_chart per panel this serializes a single figure spec over
+	the websocket for the whole grid.
+	"""
+	return _loads(_multi_line_facet_json(x, panels, titles, height, cols, show_mom_change))
+
+
+@st.cache_data(show_spinner=False, hash_funcs=_DF_HASH_FUNCS)
+def _multi_line_facet_json(x: np.ndarray, panels: List[Dict[str, np.ndarray]], titles: Optional[List[str]] = None, height: int = 200, cols: int = 3, show_mom_change: bool = False) -> str:
+	n_cols = min(cols, len(panels)) or 1
+	n_rows = -(-len(panels) // n_cols)
+	fig = make_subplots(
+		rows=n_rows,
+		cols=n_cols,
+		subplot_titles=titles,
+		shared_xaxes=True,
+		horizontal_spacing=0.06,
 	)
-	
-	# Custom Y-axis labels for better readability
-	if not df.empty:
-		all_values = df[y_col].dropna().tolist()
-		if all_values:
-			max_val = max(all_values)
-			min_val = min(all_values)
-			range_val = max_val - min_val
-			
-			if max_val >= 1_000_000_000:  # 1B+
-				tick_count = 6
-				tick_vals = []
-				tick_texts = []
-				for i in range(tick_count):
-					val = min_val + (range_val * i / (tick_count - 1))
-					tick_vals.append(val)
-					tick_texts.append(f"{val/1_000_000_000:.1f}B")
-				
-				fig.update_yaxes(
-					tickvals=tick_vals,
-					ticktext=tick_texts,
-					nticks=tick_count
-				)
-			elif max_val >= 1_000_000:  # 1M+
-				tick_count = 6
-				tick_vals = []
-				tick_texts = []
-				for i in range(tick_count):
-					val = min_val + (range_val * i / (tick_count - 1))
-					tick_vals.append(val)
-					tick_texts.append(f"{val/1_000_000:.1f}M")
-				
-				fig.update_yaxes(
-					tickvals=tick_vals,
-					ticktext=tick_texts,
-					nticks=tick_count
-				)
-			elif max_val >= 1_000:  # 1K+
-				tick_count = 6
-				tick_vals = []
-				tick_texts = []
-				for i in range(tick_count):
-					val = min_val + (range_val * i / (tick_count - 1))
-					tick_vals.append(val)
-					tick_texts.append(f"{val/1_000:.1f}K")
-				
-				fig.update_yaxes(
-					tickvals=tick_vals,
-					ticktext=tick_texts,
-					nticks=tick_count
-				)
-	
-	fig.update_layout(margin=dict(l=2, r=2, t=20, b=10), title=title, height=180)
-	return fig
-
-
-def stacked_bar_chart(df: pd.DataFrame, x_col: str, y_cols: List[str], title: str = "", height: int = 250) -> go.Figure:
+	scatter_type = _scatter_type(len(x))
+	for facet_idx, ys in enumerate(panels):
+		for label, y_arr in ys.items():
+			trace = {
+				"type": scatter_type,
+				"x": x,
+				"y": y_arr,
+				"mode": "lines+markers",
+				"name": label,
+			}
+			if show_mom_change:
+				trace["customdata"] = _mom_change_pct(y_arr)
+				trace["hovertemplate"] = "<b>%{x}</b><br>" + \
+										f"<b>{label}:</b> %{{y:,.0f}}<br>" + \
+										"<b>전월대비:</b> %{customdata:.2f}%<br>" + \
+										"<extra></extra>"
+			else:
+				trace["hovertemplate"] = "<b>%{x}</b><br>" + \
+										f"<b>{label}:</b> %{{y:,.0f}}<br>" + \
+										"<extra></extra>"
+			fig.add_trace(trace, row=facet_idx // n_cols + 1, col=facet_idx % n_cols + 1)
+	fig.update_layout(
+		margin=dict(l=2, r=2, t=20, b=50),
+		height=height * n_rows,
+		legend=_base_legend(),
+	)
+	fig.update_yaxes(tickformat="~s", separatethousands=True)
+	if len(x):
+		fig.update_xaxes(range=[x.min(), x.max()])
+	return fig.to_json()
+
+
+def stacked_bar_chart(df: pd.DataFrame, x_col: str, y_cols: List[str], title: str = "", height: int = 250) -> dict:
+	"""Cached stacked bar chart as a figure dict; see line_chart for the JSON caching."""
+	return _loads(_stacked_bar_chart_json(df, x_col, y_cols, title, height))
+
+
+@st.cache_data(show_spinner=False, hash_funcs=_DF_HASH_FUNCS)
+def _stacked_bar_chart_json(df: pd.DataFrame, x_col: str, y_cols: List[str], title: str = "", height: int = 250) -> str:
 	"""Create a horizontal stacked bar chart from a DataFrame."""
-	fig = go.Figure()
-	
-	# Normalize each row to 100%
-	df_normalized = df.copy()
-	df_normalized['_total'] = df_normalized[y_cols].sum(axis=1)
+	present_cols = [c for c in y_cols if c in df.columns]
+
+	# Normalize each row to 100% in one vectorized pass instead of copying
+	# the frame and reassigning each column
+	mat = df[present_cols].to_numpy(dtype=np.float64)
+	# nansum keeps DataFrame.sum's skipna semantics: a row with one NaN
+	# cell still normalizes over its remaining values
+	totals = np.nansum(mat, axis=1, keepdims=True)
 	# Avoid division by zero
-	df_normalized['_total'] = df_normalized['_total'].replace(0, 1)
+	totals[totals == 0] = 1
+	pct = mat / totals * 100.0
+
+	# Vectorized sprintf for the in-bar labels; NaN cells render empty
+	labels = np.where(np.isnan(pct), "", np.char.mod("%.2f%%", pct))
 
 	# Build one-line date strings and lock category order
-	if pd.api.types.is_datetime64_any_dtype(df_normalized[x_col]):
-		date_str = df_normalized[x_col].dt.strftime('%b %d')
-		# If year changes within data, append year where it changes
-		years = df_normalized[x_col].dt.year.fillna(method='ffill')
-		if years.nunique() > 1:
-			date_str = df_normalized[x_col].dt.strftime('%b %d %Y')
+	if pd.api.types.is_datetime64_any_dtype(df[x_col]):
+		# Pick the format up front (year shown only when the data spans
+		# several years) so strftime runs exactly once
+		fmt = '%b %d %Y' if df[x_col].dt.year.nunique() > 1 else '%b %d'
+		date_str = df[x_col].dt.strftime(fmt).to_numpy()
 	else:
-		date_str = df_normalized[x_col].astype(str)
-
-	for col in y_cols:
-		if col not in df_normalized.columns:
-			continue
-		# Normalize to percentage of total
-		df_normalized[col] = (df_normalized[col] / df_normalized['_total']) * 100
-	
+		date_str = df[x_col].astype(str).to_numpy()
+
 	# Add traces for each column in the order specified
 	# 전달된 columns 순서대로 추가 (이 순서가 쌓이는 왼쪽 → 오른쪽 순서가 됨)
-	for col in y_cols:
-		if col not in df_normalized.columns:
-			continue
-		fig.add_trace(
-			go.Bar(
-				name=col,
-				orientation='h',
-				y=date_str,
-				x=df_normalized[col],
-				hovertemplate=f"<b>%{{y}}</b><br><b>{col}:</b> %{{x:.2f}}%<extra></extra>",
-				text=df_normalized[col].apply(lambda x: f"{x:.2f}%" if pd.notna(x) else ""),
-				textposition='inside'
-			)
-		)
-	
-	# Update layout
-	fig.update_layout(
-		barmode='stack',
-		margin=dict(l=100, r=20, t=40, b=30),
-		title=title,
-		height=height,
-		xaxis=dict(
+	traces = [
+		{
+			"type": "bar",
+			"name": col,
+			"orientation": "h",
+			"y": date_str,
+			"x": pct[:, i],
+			"hovertemplate": f"<b>%{{y}}</b><br><b>{col}:</b> %{{x:.2f}}%<extra></extra>",
+			"text": labels[:, i],
+			"textposition": "inside",
+		}
+		for i, col in enumerate(present_cols)
+	]
+
+	layout = {
+		"barmode": "stack",
+		"margin": dict(l=100, r=20, t=40, b=30),
+		"title": title,
+		"height": height,
+		"xaxis": dict(
 			title="Percentage (%)",
 			range=[0, 100],
-			ticksuffix="%"
+			ticksuffix="%",
 		),
-		yaxis=dict(title="", type='category', categoryorder='array', categoryarray=date_str.tolist()),
-		legend=dict(
+		"yaxis": dict(title="", type='category', categoryorder='array', categoryarray=date_str),
+		"legend": dict(
 			orientation="h",
 			yanchor="bottom",
 			y=1.02,
 			xanchor="center",
 			x=0.5,
-			traceorder='normal'  # 중요: legend 순서를 trace 추가 순서대로
-		)
-	)
-	
-	return fig
+			traceorder='normal',  # 중요: legend 순서를 trace 추가 순서대로
+		),
+	}
 
+	return go.Figure(dict(data=traces, layout=layout), skip_invalid=True).to_json()
@@ -1,12 +1,27 @@
+import functools
 import io
 import re
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Sequence
 
 import pandas as pd
 import requests
 import streamlit as st
 
+# Shared session so repeated sheet loads reuse the TCP/TLS connection to
+# docs.google.com instead of paying a fresh handshake per request
+_SESSION = requests.Session()
+_SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8))
 
+# Prefer pyarrow's multithreaded CSV reader when it is installed
+try:
+	import pyarrow  # noqa: F401
+	_CSV_ENGINE: Optional[str] = "pyarrow"
+except ImportError:
+	_CSV_ENGINE = None
+
+
+@functools.lru_cache(maxsize=32)
 def _to_csv_export_url(google_sheets_url: str, gid: Optional[str] = None) -> str:
 	"""Convert a Google Sheets edit URL to a CSV export URL.
 
@@ -19,7 +34,7 @@ def _to_csv_export_url(google_sheets_url: str, gid: Optional[str] = None) -> str
 
 	Returns a CSV export URL targeting the same gid.
 	"""
-	match = re.search(r"/spreadsheets/d/([a-zA-Z0-9-_]+)", google_sheets_url)
+	match = _SHEET_ID_RE.search(google_sheets_url)
 	if not match:
 		raise ValueError("Invalid Google Sheets URL: sheet id not found")
 	sheet_id = match.group(1)
@@ -28,7 +43,7 @@ def _to_csv_export_url(google_sheets_url: str, gid: Optional[str] = None) -> str
 	if gid is not None:
 		actual_gid = gid
 	else:
-		gid_match = re.search(r"[?&]gid=(\d+)", google_sheets_url)
+		gid_match = _GID_RE.search(google_sheets_url)
 		actual_gid = gid_match.group(1) if gid_match else "0"
 
 	return (
@@ -36,40 +51,104 @@ def _to_csv_export_url(google_sheets_url: str, gid: Optional[str] = None) -> str
 	)
 
 
-@st.cache_data(show_spinner=False)
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_sheet(google_sheets_url: str, timeout_seconds: int = 20, gid: Optional[str] = None, skiprows: Optional[int] = None) -> pd.DataFrame:
+	"""Fetch and parse one worksheet, raising requests exceptions on failure.
+
+	No st.* calls happen here, so this is safe to run on worker threads
+	that have no ScriptRunContext; callers render the friendly errors on
+	the main thread via _report_fetch_error.
+	"""
+	# strip() collapses copy-pasted URL variants onto one cache entry; the
+	# sheet id itself is case-sensitive, so no lower-casing
+	csv_url = _to_csv_export_url(google_sheets_url.strip(), gid=gid)
+	response = _SESSION.get(
+		csv_url,
+		timeout=timeout_seconds,
+		headers={
+			"User-Agent": "Mozilla/5.0 (Streamlit Financial Dashboard)",
+			# Numeric CSV compresses well; requests decompresses transparently
+			"Accept-Encoding": "gzip",
+		},
+	)
+	response.raise_for_status()
+
+	# Parse straight from the response bytes; response.text would decode the
+	# whole body to a Python str only for pandas to re-scan it. The export
+	# is always UTF-8, so say so instead of letting anything sniff it.
+	if skiprows is not None:
+		return pd.read_csv(io.BytesIO(response.content), skiprows=skiprows, header=None, encoding="utf-8")
+	if _CSV_ENGINE is not None:
+		return pd.read_csv(io.BytesIO(response.content), engine=_CSV_ENGINE, encoding="utf-8")
+	return pd.read_csv(io.BytesIO(response.content), encoding="utf-8")
+
+
+def _report_fetch_error(error: requests.RequestException, google_sheets_url: str, gid: Optional[str]) -> None:
+	"""Render the friendly message for a failed sheet fetch.
+
+	Must run on the main script thread — st.error from an executor worker
+	is silently dropped for lack of a ScriptRunContext.
+	"""
+	if isinstance(error, requests.HTTPError):
+		st.error(
+			"Google Sheet에 접근할 수 없습니다. 시트를 '링크가 있는 모든 사용자 보기'로 공유하거나 '웹에 게시' 후 다시 시도하세요."
+		)
+		st.caption(f"요청 URL: {_to_csv_export_url(google_sheets_url.strip(), gid=gid)}")
+	else:
+		st.error("네트워크 오류로 데이터를 불러오지 못했습니다. 잠시 후 다시 시도하세요.")
+
+
 def load_sheet(google_sheets_url: str, timeout_seconds: int = 20, gid: Optional[str] = None, skiprows: Optional[int] = None) -> pd.DataFrame:
 	"""Load a Google Sheet as a DataFrame via CSV export with friendly errors.
-	
+
 	Args:
 		google_sheets_url: The Google Sheets URL
 		timeout_seconds: Request timeout in seconds
 		gid: Optional gid to target a specific sheet. Defaults to the gid in the URL or 0.
 		skiprows: Optional number of rows to skip at the start. Useful for headers.
 	"""
-	csv_url = _to_csv_export_url(google_sheets_url, gid=gid)
 	try:
-		response = requests.get(
-			csv_url,
-			timeout=timeout_seconds,
-			headers={"User-Agent": "Mozilla/5.0 (Streamlit Financial Dashboard)"},
-		)
-		response.raise_for_status()
-	except requests.HTTPError:
-		st.error(
-			"Google Sheet에 접근할 수 없습니다. 시트를 '링크가 있는 모든 사용자 보기'로 공유하거나 '웹에 게시' 후 다시 시도하세요."
-		)
-		st.caption(f"요청 URL: {csv_url}")
-		return pd.DataFrame()
-	except requests.RequestException:
-		st.error("네트워크 오류로 데이터를 불러오지 못했습니다. 잠시 후 다시 시도하세요.")
+		return _fetch_sheet(google_sheets_url, timeout_seconds=timeout_seconds, gid=gid, skiprows=skiprows)
+	except requests.RequestException as error:
+		_report_fetch_error(error, google_sheets_url, gid)
 		return pd.DataFrame()
 
-	# Parse CSV text safely
-	if skiprows is not None:
-		df = pd.read_csv(io.StringIO(response.text), skiprows=skiprows, header=None)
-	else:
-		df = pd.read_csv(io.StringIO(response.text))
-	return df
+
+def load_sheets_batch(google_sheets_url: str, gids: Sequence[str], timeout_seconds: int = 20, skiprows: Optional[Dict[str, int]] = None) -> Dict[str, pd.DataFrame]:
+	"""Load several worksheets of one spreadsheet in one call.
+
+	The CSV export endpoint serves a single gid per request, so this issues
+	one request per gid over the shared keep-alive session — the closest
+	credential-free equivalent of the Sheets API batchGet. The requests run
+	concurrently, so wall time is max(per-sheet latency) rather than the sum.
+
+	Args:
+		google_sheets_url: The Google Sheets URL
+		gids: gids of the worksheets to fetch
+		timeout_seconds: Per-request timeout in seconds
+		skiprows: Optional per-gid mapping of rows to skip (see load_sheet)
+
+	Returns a dict mapping each gid to its DataFrame.
+	"""
+	skiprows = skiprows or {}
+	if len(gids) == 1:
+		gid = gids[0]
+		return {gid: load_sheet(google_sheets_url, timeout_seconds=timeout_seconds, gid=gid, skiprows=skiprows.get(gid))}
+	with ThreadPoolExecutor(max_workers=min(len(gids), 4)) as executor:
+		# Workers only fetch and parse; errors surface through future.result()
+		# and are rendered here on the main thread, where st.error works
+		futures = {
+			gid: executor.submit(_fetch_sheet, google_sheets_url, timeout_seconds=timeout_seconds, gid=gid, skiprows=skiprows.get(gid))
+			for gid in gids
+		}
+		results = {}
+		for gid, future in futures.items():
+			try:
+				results[gid] = future.result()
+			except requests.RequestException as error:
+				_report_fetch_error(error, google_sheets_url, gid)
+				results[gid] = pd.DataFrame()
+		return results
 
 
 def get_sheet_gid(sheet_name: str) -> Optional[str]:
@@ -92,45 +171,93 @@ def get_sheet_gid(sheet_name: str) -> Optional[str]:
 	return known_sheets.get(sheet_name)
 
 
-def coerce_date_column(df: pd.DataFrame, column_name: str) -> pd.DataFrame:
-	"""Ensure a column is parsed as datetime and return a copy."""
-	copy = df.copy()
-	if column_name in copy.columns:
-		copy[column_name] = pd.to_datetime(copy[column_name], errors="coerce")
-	return copy
+def coerce_date_column(df: pd.DataFrame, column_name: str, inplace: bool = False) -> pd.DataFrame:
+	"""Ensure a column is parsed as datetime.
+
+	Returns a copy by default; pass inplace=True to skip the full-frame copy
+	when the caller overwrites its reference anyway.
+	"""
+	target = df if inplace else df.copy()
+	if column_name in target.columns:
+		target[column_name] = pd.to_datetime(target[column_name], errors="coerce", cache=True)
+	return target
+
+
+# Characters stripped from money-like strings before numeric conversion
+_NUMBER_CLEAN_RE = re.compile(r"[,₩$%\s]")
+
+# Google Sheets URL parts, compiled once instead of per load
+_SHEET_ID_RE = re.compile(r"/spreadsheets/d/([a-zA-Z0-9-_]+)")
+_GID_RE = re.compile(r"[?&]gid=(\d+)")
 
 
 def safe_number(series: pd.Series) -> pd.Series:
 	"""Convert strings with commas, currency symbols, or percentage symbols to numeric."""
-	return (
-		pd.to_numeric(
-			series.astype(str)
-			.str.replace(",", "", regex=False)
-			.str.replace("₩", "", regex=False)
-			.str.replace("$", "", regex=False)
-			.str.replace("%", "", regex=False)
-			.str.strip(),
-			errors="coerce",
-		)
+	if pd.api.types.is_numeric_dtype(series):
+		return series
+	# Cleanly numeric strings parse without any string munging; only fall
+	# back to the compiled-regex strip when the direct parse loses values
+	direct = pd.to_numeric(series, errors="coerce")
+	if direct.count() == series.count():
+		return direct
+	# One compiled-regex pass instead of four chained str.replace scans
+	return pd.to_numeric(
+		series.astype(str).str.replace(_NUMBER_CLEAN_RE, "", regex=True),
+		errors="coerce",
 	)
 
 
 
+@functools.lru_cache(maxsize=512)
 def column_index_from_letter(letter: str) -> int:
 	"""Convert Excel-style column letter to 0-based index.
 
 	Examples: 'A' -> 0, 'Z' -> 25, 'AA' -> 26, 'AM' -> 38.
 	"""
-	letter = letter.strip().upper()
-	value = 0
-	for ch in letter:
-		if not ("A" <= ch <= "Z"):
-			raise ValueError("Invalid column letter")
-		value = value * 26 + (ord(ch) - ord("A") + 1)
-	return value - 1
+	normalized = letter.strip().upper()
+	if not (normalized.isalpha() and normalized.isascii()):
+		raise ValueError("Invalid column letter")
+	# The dashboard reuses a handful of letters every rerun, so after the
+	# lru_cache warms up this body never executes again
+	return functools.reduce(lambda value, ch: value * 26 + (ord(ch) - 64), normalized, 0) - 1
+
+
+@functools.lru_cache(maxsize=512)
+def column_letter_from_index(index: int) -> str:
+	"""Inverse of column_index_from_letter: 0 -> 'A', 25 -> 'Z', 26 -> 'AA'."""
+	if index < 0:
+		raise ValueError("Invalid column index")
+	letters = ""
+	index += 1
+	while index:
+		index, remainder = divmod(index - 1, 26)
+		letters = chr(65 + remainder) + letters
+	return letters
+
+
+def attach_letter_map(df: pd.DataFrame) -> pd.DataFrame:
+	"""Attach a letter→column-name map so letter lookups become one dict hit.
+
+	Built once per prepared frame; pandas propagates attrs through filtering,
+	so the downstream per-letter lookups skip the positional iloc slice.
+	An already attached map is kept — after column pruning the positions no
+	longer match the sheet letters, so rebuilding would be wrong. Frames
+	with duplicate column names keep the positional fallback.
+	"""
+	if "letter_map" in df.attrs:
+		return df
+	if df.columns.is_unique:
+		df.attrs["letter_map"] = {column_letter_from_index(i): c for i, c in enumerate(df.columns)}
+	return df
 
 
 def get_series_by_letter(df: pd.DataFrame, letter: str) -> pd.Series:
+	letter_map = df.attrs.get("letter_map")
+	if letter_map is not None:
+		column = letter_map.get(letter.strip().upper())
+		if column is None:
+			raise IndexError(f"Column letter {letter} out of range for dataframe with {df.shape[1]} columns")
+		return df[column]
 	idx = column_index_from_letter(letter)
 	if idx < 0 or idx >= df.shape[1]:
 		raise IndexError(f"Column letter {letter} out of range for dataframe with {df.shape[1]} columns")
@@ -1,24 +1,20 @@
 import streamlit as st
 
+from app.pipeline import TIME_FILTER_OPTIONS
 
-def make_sidebar() -> str:
-	"""사이드바에 필터 섹션을 생성합니다."""
-	st.sidebar.header("필터")
-	# Time period filter with proper functionality
-	time_filter = st.sidebar.selectbox(
-		"발췌 연도, 월", 
-		options=[
-			"최근 3개월",
-			"최근 6개월", 
-			"최근 9개월",
-			"최근 12개월",
-			"최근 18개월",
-			"최근 24개월",
-			"모든 데이터"
-		], 
-		index=6  # Default to "모든 데이터"
+
+def make_time_filter() -> str:
+	"""기간 필터 selectbox를 현재 컨테이너에 생성합니다.
+
+	st.sidebar is not allowed inside an st.fragment (StreamlitAPIException
+	on 1.37), so the filter renders wherever the caller places it — inside
+	the fragment body, changing it reruns only the fragment.
+	"""
+	return st.selectbox(
+		"발췌 연도, 월",
+		options=TIME_FILTER_OPTIONS,
+		index=len(TIME_FILTER_OPTIONS) - 1,  # Default to "모든 데이터"
 	)
-	return time_filter
 
 
 def container(title: str):
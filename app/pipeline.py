@@ -0,0 +1,303 @@
+"""Shared fetch → prepare → filter pipeline for the dashboard pages.
+
+These functions used to live in streamlit_app.py. st.cache_data keys on
+function identity, so defining them once here means every page script
+(or future layout variant) hits the same cache entries instead of
+re-fetching and re-preparing per file.
+"""
+
+import re
+from typing import Optional
+
+import pandas as pd
+import streamlit as st
+
+from app.data import (
+	load_sheets_batch,
+	coerce_date_column,
+	safe_number,
+	attach_letter_map,
+	column_index_from_letter,
+)
+
+# GID for the main sheet (also present in the default URL)
+MAIN_SHEET_GID = "462380555"
+
+# GID for the "주식현황" (Stock Status) sheet
+STOCK_SHEET_GID = "172728277"
+
+# One alternation covering the date formats the sheets use:
+# YYYY-MM-DD, MM/DD/YYYY, YYYY년 MM월 DD일, MM월 DD일
+_DATE_RE = re.compile(
+	r"\d{4}-\d{1,2}-\d{1,2}"
+	r"|\d{1,2}/\d{1,2}/\d{4}"
+	r"|\d{4}년\s*\d{1,2}월\s*\d{1,2}일"
+	r"|\d{1,2}월\s*\d{1,2}일"
+)
+
+# Anchored variants for inferring an explicit to_datetime format
+_ISO_DATE_RE = re.compile(r"\d{4}-\d{1,2}-\d{1,2}$")
+_SLASH_DATE_RE = re.compile(r"\d{1,2}/\d{1,2}/\d{4}$")
+
+# Main-sheet letters the dashboard actually reads; AN backs 목표 순자산
+USED_LETTERS_MAIN = ("P", "Q", "S", "T", "X", "AC", "AF", "AG", "AL", "AM", "AN")
+
+# Every used letter except the date column is a monetary series, so their
+# schema is known upfront and no dtype induction is needed
+MONEY_LETTERS = USED_LETTERS_MAIN
+
+# Sidebar filter label → lookback window, built once at import; "모든 데이터"
+# is intentionally absent so it falls through to returning everything
+_FILTER_LOOKBACKS = {
+	f"최근 {months}개월": pd.Timedelta(days=days)
+	for months, days in ((3, 90), (6, 180), (9, 270), (12, 365), (18, 540), (24, 730))
+}
+
+# The sidebar derives its options from the table above so the labels and
+# the lookbacks cannot drift apart
+TIME_FILTER_OPTIONS = tuple(_FILTER_LOOKBACKS) + ("모든 데이터",)
+
+
+def _infer_date_format(sample: pd.Series) -> Optional[str]:
+	"""Guess an explicit date format from sampled strings, if they are uniform.
+
+	Returning a format lets pd.to_datetime skip per-element dateutil
+	parsing; None falls back to the slow mixed-format path.
+	"""
+	strings = sample.str.strip()
+	if strings.str.match(_ISO_DATE_RE).all():
+		return "%Y-%m-%d"
+	if strings.str.match(_SLASH_DATE_RE).all():
+		return "%m/%d/%Y"
+	return None
+
+
+@st.cache_data(ttl=600, show_spinner=False, max_entries=4)
+def load_prepared(url: str):
+	"""Fetch both sheets in one batch and run prepare once per URL.
+
+	The whole fetch + regex/safe_number/to_datetime pass is memoized and
+	keyed only on the URL string, so filter changes skip straight to
+	rendering; the "데이터 고침" button clears st.cache_data, which
+	invalidates this too. max_entries bounds the cache if a user cycles
+	through several sheet URLs in one session.
+	Returns (prepared main DataFrame, raw 주식현황 DataFrame).
+	"""
+	sheets = load_sheets_batch(url, (MAIN_SHEET_GID, STOCK_SHEET_GID), skiprows={STOCK_SHEET_GID: 0})
+	return prepare(sheets[MAIN_SHEET_GID]), sheets[STOCK_SHEET_GID]
+
+
+def _project_used_columns(df: pd.DataFrame) -> pd.DataFrame:
+	"""Drop main-sheet columns the dashboard never reads.
+
+	Every prepare pass costs per column, so pruning first cuts that work
+	(and the Arrow payload) proportionally. The letter map is built against
+	the full sheet before pruning, so letter lookups keep meaning the
+	original sheet positions afterwards.
+	"""
+	if df.shape[1] <= column_index_from_letter(USED_LETTERS_MAIN[-1]):
+		return df  # narrower than the expected sheet layout; leave as is
+	attach_letter_map(df)
+	letter_map = df.attrs.get("letter_map")
+	if not letter_map:
+		return df
+	keep = {letter_map[letter] for letter in USED_LETTERS_MAIN if letter in letter_map}
+	# Date-named columns stay so date coercion and the time filter keep working
+	for col in df.columns:
+		col_str = str(col)
+		if col_str.lower().find("date") >= 0 or col_str.endswith(("월", "날짜", "일", "시간")):
+			keep.add(col)
+	# copy() makes the narrow frame own its data so the in-place passes
+	# below don't write through a view of the wide one
+	projected = df[[c for c in df.columns if c in keep]].copy()
+	projected.attrs["letter_map"] = {letter: c for letter, c in letter_map.items() if c in keep}
+	return projected
+
+
+def _record_date_metadata(df: pd.DataFrame) -> pd.DataFrame:
+	"""Attach the date column, its monotonicity, and the letter map.
+
+	Recorded once here so the time filter (run on every rerun) gets all
+	three in dict lookups; attrs survive filtering.
+	"""
+	date_col = next((c for c in df.columns if str(df[c].dtype).startswith("datetime")), None)
+	if date_col is not None:
+		df.attrs["date_col"] = date_col
+		# Checked once here; any slice of a monotonic series stays monotonic,
+		# so the flag remains valid on filtered frames
+		df.attrs["date_monotonic"] = bool(df[date_col].is_monotonic_increasing)
+	# Letter lookups downstream become dict hits instead of iloc slices
+	return attach_letter_map(df)
+
+
+def prepare(df: pd.DataFrame) -> pd.DataFrame:
+	df = _project_used_columns(df)
+
+	# Warm-path short-circuit: a frame that is already fully typed (no
+	# object columns left, a datetime column present) has nothing to infer
+	if not df.select_dtypes(include="object").columns.size and any(str(t).startswith("datetime") for t in df.dtypes):
+		return _record_date_metadata(df)
+
+	# Attempt common column conversions
+	date_name_cols = []
+	for col in df.columns:
+		col_str = str(col)  # Convert column name to string
+		if col_str.lower().find("date") >= 0 or col_str.endswith(("월", "날짜", "일", "시간")):
+			date_name_cols.append(col)
+			# df is rebound right here, so skip the defensive full-frame copy
+			df = coerce_date_column(df, col, inplace=True)
+
+	# Let pandas' C-level inference claim cleanly typed object columns
+	# before the custom money-format pass
+	df = df.infer_objects()
+
+	# Conversions are collected per pass and applied with one assign each:
+	# a single BlockManager consolidation instead of one per column
+	replacements = {}
+
+	# Columns behind known money letters are parsed outright on their
+	# declared schema; only unmapped columns go through the sampled
+	# acceptance threshold below
+	letter_map = df.attrs.get("letter_map") or {}
+	for letter in MONEY_LETTERS:
+		col = letter_map.get(letter)
+		if col is not None and col in df.columns and df[col].dtype == object:
+			replacements[col] = safe_number(df[col])
+
+	for col in df.select_dtypes(include="object").columns:
+		if col in date_name_cols or col in replacements:
+			continue
+		try:
+			# Best-effort numeric conversion for money-like fields,
+			# decided on a bounded sample so rejected columns don't
+			# pay a full-column parse
+			sample = df[col].head(10_000)
+			maybe_numeric = safe_number(sample)
+			# Only replace if we actually got numbers in many rows; count()
+			# reads the validity mask directly instead of materializing a
+			# boolean Series and summing it
+			if maybe_numeric.count() >= max(3, len(maybe_numeric) // 2):
+				# Kept at full precision: float32 cannot represent
+				# billion-scale won amounts exactly and the headline
+				# metrics print exact figures. Charts downcast their own
+				# arrays at the chart boundary instead.
+				replacements[col] = maybe_numeric if len(sample) == len(df) else safe_number(df[col])
+		except Exception:
+			continue
+	if replacements:
+		df = df.assign(**replacements)
+
+	# Additional date detection for columns that might contain dates
+	date_replacements = {}
+	for col in df.select_dtypes(include="object").columns:
+		try:
+			# Try to detect if this column contains dates
+			sample_values = df[col].dropna().head(20)
+			if len(sample_values) > 0:
+				# Stringify once, then one vectorized scan for date shapes
+				sample_strings = sample_values.astype(str)
+				date_like_count = sample_strings.str.contains(_DATE_RE, na=False).sum()
+
+				# If more than 70% look like dates, convert the column
+				if date_like_count >= len(sample_values) * 0.7:
+					date_replacements[col] = pd.to_datetime(df[col], errors="coerce", format=_infer_date_format(sample_strings))
+		except Exception:
+			continue
+	if date_replacements:
+		df = df.assign(**date_replacements)
+
+	# Whatever stayed object after the numeric/date passes is usually a
+	# short repeating label (account type, owner); categorical codes shrink
+	# those from per-row pointers to 1-byte codes
+	for col in df.select_dtypes(include="object").columns:
+		try:
+			if df[col].nunique(dropna=True) / max(len(df), 1) < 0.5:
+				df[col] = df[col].astype("category")
+		except Exception:
+			continue
+
+	return _record_date_metadata(df)
+
+
+def _looks_datetime(series: pd.Series) -> bool:
+	"""Date-likeness test on a bounded sample, before any full-column parse.
+
+	Rejected columns then cost O(sample) instead of O(rows).
+	"""
+	sample = series.dropna().head(100)
+	if sample.empty:
+		return False
+	return pd.to_datetime(sample.astype(str), errors="coerce").notna().mean() > 0.7
+
+
+def apply_time_filter(df: pd.DataFrame, time_filter: str) -> pd.DataFrame:
+	"""
+	Applies a time filter to the DataFrame based on the selected time period.
+	"""
+	# Find the date column - try multiple strategies
+	date_col = None
+
+	# Strategy 0: prepare already recorded its pick on the frame
+	recorded = df.attrs.get("date_col")
+	if recorded in df.columns and str(df[recorded].dtype).startswith("datetime"):
+		date_col = recorded
+
+	# Strategy 1: Look for existing datetime columns. After prepare this
+	# normally hits, so the re-parsing strategies below never run.
+	if not date_col:
+		date_col = next((c for c in df.columns if str(df[c].dtype).startswith("datetime")), None)
+
+	# Strategy 2: Look for columns with date-related names
+	if not date_col:
+		date_keywords = ["date", "날짜", "월", "일", "time", "시간"]
+		for col in df.columns:
+			if any(keyword in col.lower() for keyword in date_keywords):
+				# Test a sample before paying the full-column parse; no need
+				# to copy the whole frame for one candidate either
+				try:
+					if not _looks_datetime(df[col]):
+						continue
+					fmt = _infer_date_format(df[col].dropna().head(100).astype(str))
+					parsed = pd.to_datetime(df[col], errors="coerce", format=fmt)
+					# Check if conversion was successful (not all NaT);
+					# count() avoids materializing a boolean mask
+					if parsed.count() > len(df) * 0.5:  # At least 50% valid dates
+						df[col] = parsed
+						date_col = col
+						break
+				except:
+					continue
+
+	# Strategy 3: Look for the first column that might be dates
+	if not date_col:
+		for col in df.columns:
+			try:
+				# Sample test first; the full parse runs at most once
+				if _looks_datetime(df[col]):
+					fmt = _infer_date_format(df[col].dropna().head(100).astype(str))
+					df[col] = pd.to_datetime(df[col], errors="coerce", format=fmt)
+					date_col = col
+					break
+			except:
+				continue
+
+	if not date_col:
+		st.warning("날짜 컬럼을 찾을 수 없습니다. 모든 데이터를 표시합니다.")
+		return df  # No date column found, return all data
+
+	# Unrecognized filters (and "모든 데이터") fall through to all data
+	lookback = _FILTER_LOOKBACKS.get(time_filter)
+	if lookback is None:
+		return df
+
+	# Filter data based on the cutoff date
+	cutoff_date = df[date_col].max() - lookback
+	dates = df[date_col]
+	monotonic = df.attrs.get("date_monotonic")
+	if monotonic is None:
+		monotonic = dates.is_monotonic_increasing
+	if monotonic:
+		# The sheet is a sorted monthly series, so an O(log n) cut plus a
+		# positional slice replaces the full boolean mask and fancy-indexed copy
+		return df.iloc[dates.searchsorted(cutoff_date, side="left"):]
+	return df[dates >= cutoff_date]